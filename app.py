@@ -1,16 +1,20 @@
 
 
+import asyncio
+import json
+import os
 import streamlit as st
 import sys
-import traceback
-from langchain_core.messages import HumanMessage
+import threading
 
 # Import configuration and styling
-from src.app_config import setup_page, apply_custom_css
+from src.app_config import setup_page, apply_custom_css, get_valid_columns, warm_up_llm, CHART_WIDTH
 
 # Import utility functions
 from src.app_utils import (
+    ResponseCache,
     StreamlitCapturer,
+    format_analysis,
     parse_analysis_response,
     find_generated_image
 )
@@ -20,19 +24,36 @@ from src.app_components import (
     initialize_session_state,
     render_sidebar,
     render_welcome_screen,
-    render_chat_message
+    render_chat_history,
+    add_message
 )
 
-# Import LangGraph workflow
-from src.main import app as graph_app, VALID_COLUMNS
+# --- RESPONSE CACHE ---
+@st.cache_resource
+def get_response_cache():
+    """Process-wide cache of completed responses, shared across sessions."""
+    return ResponseCache(ttl=60 * 60)
+
+@st.cache_data(show_spinner=False)
+def load_png_bytes(path: str, mtime: float) -> bytes:
+    """Read a chart once per file version; mtime invalidates rewrites."""
+    with open(path, "rb") as file:
+        return file.read()
+
+@st.cache_resource
+def warm_llm():
+    """Load the model in the background, once per process."""
+    threading.Thread(target=warm_up_llm, daemon=True).start()
+    return True
 
 # --- SETUP ---
 setup_page()
 apply_custom_css()
 initialize_session_state()
+warm_llm()
 
 # --- SIDEBAR ---
-render_sidebar(VALID_COLUMNS)
+render_sidebar(get_valid_columns())
 
 # --- MAIN CONTENT ---
 st.title("⚽ SkillCorner AI Data Analyst")
@@ -42,8 +63,49 @@ if not st.session_state.conversation_started:
     render_welcome_screen()
 
 # --- RENDER CHAT HISTORY ---
-for msg in st.session_state.messages:
-    render_chat_message(msg)
+# Only the most recent window is drawn; older messages load on request
+render_chat_history()
+
+# --- WORKFLOW STREAMING ---
+def get_workflow():
+    """
+    Import and compile the LangGraph workflow on first use.
+    
+    Deferring the import keeps LangChain, Ollama and the plotting stack
+    off the welcome screen's critical path.
+    """
+    from src.main import get_graph_app
+    return get_graph_app()
+
+
+async def stream_workflow(inputs, placeholder):
+    """
+    Stream LangGraph state updates into a placeholder as each node finishes.
+    
+    Intermediate output is drawn as plain text; the caller renders the
+    final markdown once the workflow has completed.
+    
+    Args:
+        inputs: Initial graph state
+        placeholder: Streamlit container to draw partial output into
+        
+    Returns:
+        Final graph state
+    """
+    final_state = None
+    async for state in get_workflow().astream(
+        inputs, config={"recursion_limit": 20}, stream_mode="values"
+    ):
+        final_state = state
+        last_message = state["messages"][-1]
+        if last_message.additional_kwargs.get("structured"):
+            # Final JSON payload; rendered as markdown by the caller
+            continue
+        partial = last_message.content
+        if isinstance(partial, str) and partial.strip():
+            placeholder.text(partial)
+    return final_state
+
 
 # --- QUERY PROCESSING FUNCTION ---
 def process_user_query(prompt):
@@ -57,7 +119,7 @@ def process_user_query(prompt):
     st.session_state.conversation_started = True
     
     # Add user message to history
-    st.session_state.messages.append({"role": "user", "content": prompt})
+    add_message({"role": "user", "content": prompt})
     
     # Display user message
     with st.chat_message("user"):
@@ -67,6 +129,10 @@ def process_user_query(prompt):
     with st.chat_message("assistant"):
         message_placeholder = st.empty()
         
+        # Repeat prompts are answered from the shared response cache
+        response_cache = get_response_cache()
+        cached = response_cache.get(prompt)
+        
         # Show processing status
         with st.status("🔄 Analyzing your query...", expanded=True) as status_container:
             # Capture logs
@@ -80,12 +146,15 @@ def process_user_query(prompt):
                 # Redirect stdout to capture print statements
                 sys.stdout = capturer
                 
-                # Run LangGraph workflow
-                inputs = {"messages": [HumanMessage(content=prompt)]}
-                final_state = graph_app.invoke(inputs, config={"recursion_limit": 20})
+                if cached is None:
+                    from langchain_core.messages import HumanMessage
+                    
+                    # Run LangGraph workflow
+                    inputs = {"messages": [HumanMessage(content=prompt)]}
+                    final_state = asyncio.run(stream_workflow(inputs, message_placeholder))
                 
                 status_container.update(
-                    label="✅ Analysis Complete!", 
+                    label="⚡ Loaded from cache" if cached else "✅ Analysis Complete!", 
                     state="complete", 
                     expanded=False
                 )
@@ -100,57 +169,81 @@ def process_user_query(prompt):
                 st.error(f"**Workflow Error:** {str(e)}")
                 
                 # Show traceback in expander
+                import traceback
                 with st.expander("🐛 Debug Info"):
                     st.code(traceback.format_exc())
                 
             finally:
-                # Restore stdout
+                # Restore stdout and show any throttled log lines
                 sys.stdout = original_stdout
+                capturer.flush_pending()
 
         # Process successful results
-        if final_state and not error_occurred:
+        if (cached or final_state) and not error_occurred:
             try:
-                history = final_state["messages"]
-                last_message = history[-1]
-                
-                # Find generated image
-                generated_image = find_generated_image(history)
-                
-                # Parse response
-                parsed = parse_analysis_response(last_message.content)
+                if cached is None:
+                    history = final_state["messages"]
+                    last_message = history[-1]
+                    
+                    # Find generated image
+                    generated_image = find_generated_image(history)
+                    
+                    # Structured responses are decoded directly; anything
+                    # else (errors, fallbacks) goes through the parser
+                    if last_message.additional_kwargs.get("structured"):
+                        parsed = format_analysis(json.loads(last_message.content))
+                    else:
+                        parsed = parse_analysis_response(last_message.content)
+                    
+                    # Snapshot the chart bytes: chart filenames are reused
+                    # across queries, so a cached path could go stale
+                    cached = {
+                        "formatted": parsed["formatted"],
+                        "image_name": generated_image,
+                        "image": None,
+                        "logs": capturer.get_value()
+                    }
+                    if generated_image:
+                        # The tools keep the bytes they just rendered; the
+                        # file is only read back if they have been evicted
+                        from src.tools.visualisation_tools import get_rendered_png
+                        cached["image"] = get_rendered_png(generated_image) or load_png_bytes(
+                            generated_image, os.path.getmtime(generated_image)
+                        )
+                    # Only complete runs (a chart plus a structured analysis)
+                    # are cached; fallbacks would be served to every session
+                    if cached["image"] and last_message.additional_kwargs.get("structured"):
+                        response_cache.put(prompt, cached)
                 
                 # Display formatted response
-                message_placeholder.markdown(parsed["formatted"])
+                message_placeholder.markdown(cached["formatted"])
                 
                 # Prepare response payload
                 response_payload = {
                     "role": "assistant", 
-                    "content": parsed["formatted"],
-                    "logs": capturer.get_value()
+                    "content": cached["formatted"],
+                    "logs": cached["logs"]
                 }
                 
                 # Display image if found
-                if generated_image:
-                    col1, col2, col3 = st.columns([1, 3, 1])
-                    with col2:
-                        st.image(
-                            generated_image, 
-                            caption="📊 Generated Visualization", 
-                            use_container_width=True
-                        )
-                    response_payload["image"] = generated_image
+                if cached["image"]:
+                    st.image(
+                        cached["image"], 
+                        caption="📊 Generated Visualization", 
+                        width=CHART_WIDTH
+                    )
+                    response_payload["image"] = cached["image"]
                     
                     # Add download button
-                    with open(generated_image, "rb") as file:
-                        st.download_button(
-                            label="📥 Download Chart",
-                            data=file,
-                            file_name=generated_image,
-                            mime="image/png"
-                        )
+                    st.download_button(
+                        label="📥 Download Chart",
+                        data=cached["image"],
+                        file_name=cached["image_name"],
+                        mime="image/png"
+                    )
                 
                 # Save to session state
-                st.session_state.messages.append(response_payload)
+                add_message(response_payload)
                 
             except Exception as e:
                 st.error(f"**Display Error:** {str(e)}")
@@ -160,7 +253,7 @@ def process_user_query(prompt):
                 
         elif error_occurred:
             # Add error message to history
-            st.session_state.messages.append({
+            add_message({
                 "role": "assistant",
                 "content": "❌ I encountered an error processing your request. Please try rephrasing your query or check the logs above.",
                 "logs": capturer.get_value()
@@ -4,7 +4,7 @@ Reusable Streamlit components for sidebar, welcome screen, and chat messages
 """
 
 import streamlit as st
-from src.app_config import EXAMPLE_QUERIES
+from src.app_config import EXAMPLE_QUERIES, HISTORY_WINDOW, CHART_WIDTH
 
 
 # --- SESSION STATE ---
@@ -15,6 +15,25 @@ def initialize_session_state():
     
     if "conversation_started" not in st.session_state:
         st.session_state["conversation_started"] = False
+    
+    if "stats" not in st.session_state:
+        st.session_state["stats"] = {"user": 0, "charts": 0, "total": 0}
+
+
+def add_message(msg):
+    """
+    Append a message to the chat history and update session stats.
+    
+    Args:
+        msg: Message dictionary with role, content, image, logs
+    """
+    st.session_state["messages"].append(msg)
+    stats = st.session_state["stats"]
+    stats["total"] += 1
+    if msg.get("role") == "user":
+        stats["user"] += 1
+    if msg.get("image"):
+        stats["charts"] += 1
 
 
 # --- SIDEBAR COMPONENTS ---
@@ -34,6 +53,9 @@ def render_sidebar(valid_columns):
         # Quick actions
         render_quick_actions()
         
+        # Chat history window
+        render_history_controls()
+        
         # Session stats
         render_session_stats()
 
@@ -51,10 +73,11 @@ def render_dataset_info(valid_columns):
         if valid_columns:
             st.caption(f"**Available Columns:** {len(valid_columns)}")
             with st.expander("View All Columns"):
-                for col in valid_columns[:20]:
-                    st.text(f"• {col}")
+                # One element for the whole list instead of one per column
+                lines = [f"• {col}" for col in valid_columns[:20]]
                 if len(valid_columns) > 20:
-                    st.caption(f"... and {len(valid_columns) - 20} more")
+                    lines.append(f"... and {len(valid_columns) - 20} more")
+                st.code("\n".join(lines), language=None)
 
 
 def render_quick_actions():
@@ -67,6 +90,8 @@ def render_quick_actions():
         if st.button("🔄 Clear Chat", use_container_width=True):
             st.session_state["messages"] = []
             st.session_state["conversation_started"] = False
+            st.session_state["stats"] = {"user": 0, "charts": 0, "total": 0}
+            st.session_state.pop("history_window_size", None)
             st.rerun()
     
     with col2:
@@ -84,19 +109,39 @@ def render_quick_actions():
             st.button("📥 Export", disabled=True, use_container_width=True)
 
 
+def get_history_start():
+    """
+    Index of the first chat message inside the window.
+    The window is a message count from the end, so it does not grow as new
+    messages arrive.
+    """
+    size = st.session_state.get("history_window_size", HISTORY_WINDOW)
+    return max(0, len(st.session_state.get("messages", [])) - size)
+
+
+def render_history_controls():
+    """Render the button that reveals earlier chat messages."""
+    start = get_history_start()
+    
+    if start > 0:
+        charts = sum(1 for msg in st.session_state.messages[:start] if msg.get("image"))
+        chart_note = f" ({charts} with charts)" if charts else ""
+        st.caption(f"{start} earlier messages hidden{chart_note}")
+        if st.button(f"⬆️ Load {HISTORY_WINDOW} earlier", use_container_width=True):
+            size = st.session_state.get("history_window_size", HISTORY_WINDOW)
+            st.session_state["history_window_size"] = size + HISTORY_WINDOW
+            st.rerun()
+
+
 def render_session_stats():
     """Render session statistics."""
-    messages = st.session_state.get("messages", [])
+    stats = st.session_state.get("stats")
     
-    if messages:
+    if stats and stats["total"]:
         st.header("📈 Session Stats")
-        st.metric("Total Messages", len(messages))
-        
-        user_msgs = sum(1 for m in messages if m.get("role") == "user")
-        st.metric("Your Queries", user_msgs)
-        
-        charts = sum(1 for m in messages if m.get("image"))
-        st.metric("Charts Generated", charts)
+        st.metric("Total Messages", stats["total"])
+        st.metric("Your Queries", stats["user"])
+        st.metric("Charts Generated", stats["charts"])
 
 
 # --- WELCOME SCREEN ---
@@ -149,6 +194,12 @@ def render_welcome_screen():
 
 
 # --- CHAT MESSAGE RENDERING ---
+def render_chat_history():
+    """Render the visible window of chat history."""
+    for msg in st.session_state.messages[get_history_start():]:
+        render_chat_message(msg)
+
+
 def render_chat_message(msg):
     """
     Render a single chat message.
@@ -159,17 +210,16 @@ def render_chat_message(msg):
     with st.chat_message(msg["role"]):
         # Display content
         if msg.get("content"):
+            # Same renderer as the live answer, so replays look identical
             st.markdown(msg["content"])
         
         # Display image if available
         if msg.get("image"):
-            col1, col2, col3 = st.columns([1, 3, 1])
-            with col2:
-                st.image(
-                    msg["image"], 
-                    caption="📊 Generated Visualization", 
-                    use_container_width=True
-                )
+            st.image(
+                msg["image"], 
+                caption="📊 Generated Visualization", 
+                width=CHART_WIDTH
+            )
         
         # Display logs in expander
         if msg.get("logs"):
@@ -5,6 +5,36 @@ Contains page config, CSS, and UI constants
 
 import streamlit as st
 
+# --- DATA SOURCE ---
+DATA_URL = "https://raw.githubusercontent.com/SkillCorner/opendata/master/data/aggregates/aus1league_physicalaggregates_20242025_midfielders.csv"
+
+
+@st.cache_data(ttl=24 * 60 * 60)
+def get_valid_columns():
+    """Fetches the dataset header once a day instead of on every import."""
+    # Imported here so the welcome screen does not pay for pandas up front
+    import pandas as pd
+    try: 
+        return pd.read_csv(DATA_URL, nrows=0).columns.tolist()
+    except: 
+        return []
+
+
+# --- LLM ---
+LLM_MODEL = "llama3.1:latest"
+
+
+def warm_up_llm():
+    """Sends a one-token request so Ollama loads the model before the first query."""
+    # Only the Ollama client is imported, so warming up does not pull in
+    # the workflow, the tools or the plotting stack
+    from langchain_ollama import ChatOllama
+    try:
+        ChatOllama(model=LLM_MODEL, temperature=0, num_predict=1).invoke("ping")
+    except Exception as e:
+        print(f"LLM warm-up failed: {e}")
+
+
 # --- PAGE CONFIGURATION ---
 def setup_page():
     """Configure Streamlit page settings."""
@@ -17,9 +47,7 @@ def setup_page():
 
 
 # --- CUSTOM CSS ---
-def apply_custom_css():
-    """Apply custom styling to the application."""
-    st.markdown("""
+CUSTOM_CSS = """
         <style>
         /* Main styling */
         .stChatMessage { 
@@ -79,7 +107,17 @@ def apply_custom_css():
             margin: 5px;
         }
         </style>
-        """, unsafe_allow_html=True)
+        """
+
+
+def apply_custom_css():
+    """
+    Apply custom styling to the application.
+    
+    Streamlit drops any element not re-emitted on a rerun, so the style
+    block is sent every run; only the string itself is built once.
+    """
+    st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
 
 
 # --- EXAMPLE QUERIES ---
@@ -89,4 +127,11 @@ EXAMPLE_QUERIES = [
     "What's the profile of A. Taggart?",
     "Which players have the highest acceleration?",
     "Show me the relationship between sprints and total distance"
-]
\ No newline at end of file
+]
+
+# --- CHAT HISTORY ---
+# Number of most recent messages rendered before "Load earlier" is needed
+HISTORY_WINDOW = 20
+
+# Fixed pixel width for chart images, so no column layout is needed
+CHART_WIDTH = 600
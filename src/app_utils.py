@@ -6,11 +6,22 @@ Helper functions for parsing, finding images, and capturing logs
 import os
 import re
 import ast
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
 from io import StringIO
-from langchain_core.messages import ToolMessage
 
 
 # --- LOG CAPTURE CLASS ---
+# Log lines containing any of these are echoed to the status container live
+LIVE_LOG_KEYWORDS = ("executing", "sql", "error", "success", "created")
+
+# Minimum seconds between live log updates pushed to the status container
+LIVE_LOG_INTERVAL = 0.1
+
+
 class StreamlitCapturer:
     """Captures stdout and displays in Streamlit status container."""
     
@@ -18,52 +29,126 @@ class StreamlitCapturer:
         self.container = container
         self.buffer = StringIO()
         self.log_lines = []
+        self._seen = set()
+        self._residual = ""
+        self._pending = []
+        self._last_flush = 0.0
 
     def write(self, text):
         self.buffer.write(text)
-        if text.strip():
-            clean_text = text.replace("---", "").strip()
-            if clean_text and clean_text not in self.log_lines:
-                self.log_lines.append(clean_text)
-                # Show only important logs in real-time
-                if any(keyword in clean_text.lower() for keyword in 
-                       ["executing", "sql", "error", "success", "created"]):
-                    self.container.write(f"⚙️ {clean_text}")
+        # Only act on complete lines; a partial line waits for its newline
+        self._residual += text
+        *lines, self._residual = self._residual.split("\n")
+        for line in lines:
+            self._add_line(line)
+
+    def _add_line(self, line):
+        clean_text = line.replace("---", "").strip()
+        if clean_text and clean_text not in self._seen:
+            self._seen.add(clean_text)
+            self.log_lines.append(clean_text)
+            # Show only important logs in real-time
+            lower = clean_text.lower()
+            if any(keyword in lower for keyword in LIVE_LOG_KEYWORDS):
+                self._pending.append(f"⚙️ {clean_text}")
+                if time.monotonic() - self._last_flush > LIVE_LOG_INTERVAL:
+                    self.flush_pending()
+
+    def flush_pending(self):
+        """Push batched live log lines to the container in one update."""
+        if self._pending:
+            self.container.code("\n".join(self._pending), language=None)
+            self._pending = []
+        self._last_flush = time.monotonic()
 
     def flush(self):
         pass
         
     def get_value(self):
+        if self._residual:
+            self._add_line(self._residual)
+            self._residual = ""
         return "\n".join(self.log_lines)
 
 
+# --- RESPONSE CACHE ---
+def prompt_cache_key(prompt: str) -> str:
+    """
+    Build a cache key that ignores case, punctuation and spacing.
+    
+    Args:
+        prompt: User's question/query
+        
+    Returns:
+        Hex digest identifying the normalized prompt
+    """
+    normalized = re.sub(r"[^\w\s]", "", prompt.lower())
+    normalized = " ".join(normalized.split())
+    return hashlib.md5(normalized.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    In-memory LRU cache of completed responses with a time-to-live.
+    Shared across sessions, so access is locked and the size is bounded.
+    """
+    
+    def __init__(self, ttl: float = 3600, max_entries: int = 64):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, prompt: str):
+        key = prompt_cache_key(prompt)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, payload = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return payload
+
+    def put(self, prompt: str, payload: dict):
+        key = prompt_cache_key(prompt)
+        now = time.monotonic()
+        with self._lock:
+            # Drop expired entries so unread prompts do not pin their charts
+            expired = [k for k, (stored_at, _) in self._entries.items() if now - stored_at > self.ttl]
+            for k in expired:
+                del self._entries[k]
+            self._entries[key] = (now, payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
 # --- RESPONSE PARSING ---
-def parse_analysis_response(content: str) -> dict:
+def format_analysis(data: dict) -> dict:
     """
-    Parse the structured analysis response.
+    Format an already-decoded analysis response.
     
     Args:
-        content: String content from analyst LLM
+        data: Dictionary with executive_summary, detailed_analysis, key_trends
         
     Returns:
         Dictionary with formatted sections
     """
-    try:
-        if isinstance(content, str) and "executive_summary" in content:
-            data = ast.literal_eval(content)
-            
-            # Format trends list
-            trends = data.get('key_trends', [])
-            if isinstance(trends, list):
-                trends_text = "\n".join([f"• {t}" for t in trends])
-            else:
-                trends_text = str(trends)
-            
-            return {
-                "summary": data.get('executive_summary', 'N/A'),
-                "analysis": data.get('detailed_analysis', 'N/A'),
-                "trends": trends_text,
-                "formatted": f"""
+    # Format trends list
+    trends = data.get('key_trends', [])
+    if isinstance(trends, list):
+        trends_text = "\n".join([f"• {t}" for t in trends])
+    else:
+        trends_text = str(trends)
+    
+    return {
+        "summary": data.get('executive_summary', 'N/A'),
+        "analysis": data.get('detailed_analysis', 'N/A'),
+        "trends": trends_text,
+        "formatted": f"""
 ### 📋 Executive Summary
 {data.get('executive_summary', 'N/A')}
 
@@ -73,7 +158,26 @@ def parse_analysis_response(content: str) -> dict:
 ### 📊 Key Trends
 {trends_text}
 """
-            }
+    }
+
+
+def parse_analysis_response(content: str) -> dict:
+    """
+    Parse the structured analysis response.
+    
+    Args:
+        content: String content from analyst LLM
+        
+    Returns:
+        Dictionary with formatted sections
+    """
+    try:
+        if isinstance(content, str) and "executive_summary" in content:
+            try:
+                data = json.loads(content)
+            except ValueError:
+                data = ast.literal_eval(content)
+            return format_analysis(data)
     except Exception as e:
         pass
     
@@ -87,6 +191,15 @@ def parse_analysis_response(content: str) -> dict:
 
 
 # --- IMAGE FINDING ---
+# Quoted, double-quoted, backticked or bare PNG filenames, in one pass
+PNG_FILENAME_RE = re.compile(
+    r"'([^']+\.png)'"      # Single quotes
+    r'|"([^"]+\.png)"'     # Double quotes
+    r"|`([^`]+\.png)`"     # Backticks
+    r"|([\w\-\.]+\.png)"  # Simple filename
+)
+
+
 def find_generated_image(messages: list) -> str:
     """
     Search through messages to find generated PNG file.
@@ -97,24 +210,19 @@ def find_generated_image(messages: list) -> str:
     Returns:
         Filename of PNG or None
     """
+    # Imported lazily so the UI modules load without LangChain
+    from langchain_core.messages import ToolMessage
+    
+    checked = set()
     for msg in reversed(messages):
         if isinstance(msg, ToolMessage):
-            content = str(msg.content)
-            
-            # Try multiple regex patterns
-            patterns = [
-                r"'([^']+\.png)'",  # Single quotes
-                r'"([^"]+\.png)"',  # Double quotes
-                r'`([^`]+\.png)`',  # Backticks
-                r'([\w\-\.]+\.png)'  # Simple filename
-            ]
-            
-            for pattern in patterns:
-                match = re.search(pattern, content)
-                if match:
-                    filename = match.group(1)
-                    if os.path.exists(filename):
-                        return filename
+            for match in PNG_FILENAME_RE.finditer(str(msg.content)):
+                filename = next(group for group in match.groups() if group)
+                if filename in checked:
+                    continue
+                checked.add(filename)
+                if os.path.exists(filename):
+                    return filename
     
     return None
 
@@ -1,9 +1,12 @@
+from functools import lru_cache
 from typing import List, Literal, Optional
 from langchain_ollama import ChatOllama
-import pandas as pd
+import streamlit as st
 from pydantic import BaseModel, Field
 from langgraph.graph import StateGraph, START, END, MessagesState
 from langchain_core.messages import HumanMessage, SystemMessage, ToolMessage, AIMessage
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from src.app_config import get_valid_columns, LLM_MODEL
 
 # Import your tools
 from src.tools.visualisation_tools import (
@@ -13,8 +16,6 @@ from src.tools.visualisation_tools import (
 )
 
 # --- 1. CONFIGURATION & KNOWLEDGE BASE ---
-DATA_URL = "https://raw.githubusercontent.com/SkillCorner/opendata/master/data/aggregates/aus1league_physicalaggregates_20242025_midfielders.csv"
-
 def load_metric_definitions(filepath: str = "src/prompts/data_description.md") -> str:
     """Loads metric definitions."""
     try:
@@ -25,14 +26,6 @@ def load_metric_definitions(filepath: str = "src/prompts/data_description.md") -
 
 METRIC_DEFINITIONS = load_metric_definitions()
 
-def get_valid_columns():
-    try: 
-        return pd.read_csv(DATA_URL, nrows=0).columns.tolist()
-    except: 
-        return []
-
-VALID_COLUMNS = get_valid_columns()
-
 class AnalysisResponse(BaseModel):
     """Final output schema."""
     executive_summary: str = Field(..., description="High-level summary of findings.")
@@ -43,19 +36,34 @@ class AnalysisResponse(BaseModel):
 tools = [create_dynamic_bar_chart, create_dynamic_scatter_plot, create_dynamic_radar_chart]
 tools_by_name = {t.name: t for t in tools}
 
-# MODELS - Using larger models for better reasoning
-router_llm = ChatOllama(model="llama3.1:latest", temperature=0).bind_tools(tools)
-analyst_llm = ChatOllama(model="llama3.1:latest", temperature=0)
 
-# --- NODES ---
+LLM_KWARGS = {"model": LLM_MODEL, "temperature": 0}
 
-def agent_node(state: MessagesState):
-    """
-    Router Node: Analyzes query and selects appropriate visualization tool.
-    """
-    system_prompt = f"""You are a Data Visualization Router for sports analytics data.
+@st.cache_resource
+def get_router_tool_schemas():
+    """Tool schemas in the format bind_tools sends, converted once per process."""
+    return [convert_to_openai_tool(t) for t in tools]
 
-AVAILABLE COLUMNS: {", ".join(VALID_COLUMNS[:20])}...
+# The router and analyst are awaited, and each query runs on a fresh event
+# loop; a client's async connection pool is bound to the loop that first
+# used it, so only the loop-independent parts above are cached. Synchronous
+# clients (the tools' column-selection LLM) stay cached.
+def get_router_llm():
+    """Router LLM with tools bound, for one workflow run."""
+    return ChatOllama(**LLM_KWARGS).bind_tools(get_router_tool_schemas())
+
+def get_analyst_llm():
+    """Analyst LLM, for one workflow run."""
+    return ChatOllama(**LLM_KWARGS)
+
+# --- PROMPTS ---
+@lru_cache(maxsize=4)
+def build_router_prompt(columns: tuple) -> str:
+    """Router system prompt, rebuilt only when the column list changes."""
+    columns = ", ".join(columns)
+    return f"""You are a Data Visualization Router for sports analytics data.
+
+AVAILABLE COLUMNS: {columns}...
 
 YOUR TASK: Analyze the user's query and select the MOST APPROPRIATE visualization tool.
 
@@ -82,11 +90,41 @@ Example of CORRECT tool call:
 Tool: create_dynamic_radar_chart
 Arguments: {{"query": "Show me the profile for Lionel Messi", "title": "Physical Profile: Lionel Messi"}}
 """
+
+# Metric definitions are baked in once; only the tool output varies per call
+_ESCAPED_DEFINITIONS = METRIC_DEFINITIONS.replace("{", "{{").replace("}", "}}")
+ANALYST_PROMPT_TEMPLATE = f"""You are a Lead Sports Performance Analyst specializing in physical performance metrics.
+
+METRIC CONTEXT:
+{_ESCAPED_DEFINITIONS}
+
+YOUR TASK:
+Analyze the visualization results and provide professional insights.
+
+GUIDELINES:
+1. If the tool output contains "Error", explain what went wrong and suggest alternatives
+2. If successful, interpret the data in the context of sports performance
+3. Highlight standout performers or interesting patterns
+4. Use specific numbers and player names from the data
+5. Keep language professional but accessible
+
+TOOL OUTPUT:
+{{tool_output}}
+
+Provide your analysis in the structured format requested."""
+
+# --- NODES ---
+
+async def agent_node(state: MessagesState):
+    """
+    Router Node: Analyzes query and selects appropriate visualization tool.
+    """
+    system_prompt = build_router_prompt(tuple(get_valid_columns()[:20]))
     
     messages = [SystemMessage(content=system_prompt)] + state["messages"]
     
     try:
-        response = router_llm.invoke(messages)
+        response = await get_router_llm().ainvoke(messages)
         
         # Validate that tool was called
         if not hasattr(response, "tool_calls") or not response.tool_calls:
@@ -159,61 +197,36 @@ def tool_node(state: MessagesState):
     return {"messages": results}
 
 
-def analysis_node(state: MessagesState):
+async def analysis_node(state: MessagesState):
     """
     Analyst Node: Interprets visualization results and provides insights.
     """
     print("\n--- Analyzing Results ---")
-    tool_messages = [msg for msg in state["messages"] if isinstance(msg, ToolMessage)]
+    latest_tool_output = next(
+        (msg.content for msg in reversed(state["messages"]) if isinstance(msg, ToolMessage)),
+        None
+    )
     
-    if not tool_messages:
+    if latest_tool_output is None:
         return {"messages": [AIMessage(content="No visualization data available for analysis.")]}
     
-    latest_tool_output = tool_messages[-1].content
-    
-    system_prompt = f"""You are a Lead Sports Performance Analyst specializing in physical performance metrics.
-
-METRIC CONTEXT:
-{METRIC_DEFINITIONS}
-
-YOUR TASK:
-Analyze the visualization results and provide professional insights.
-
-GUIDELINES:
-1. If the tool output contains "Error", explain what went wrong and suggest alternatives
-2. If successful, interpret the data in the context of sports performance
-3. Highlight standout performers or interesting patterns
-4. Use specific numbers and player names from the data
-5. Keep language professional but accessible
-
-TOOL OUTPUT:
-{latest_tool_output}
-
-Provide your analysis in the structured format requested."""
+    system_prompt = ANALYST_PROMPT_TEMPLATE.format(tool_output=latest_tool_output)
 
     try:
-        structured_llm = analyst_llm.with_structured_output(AnalysisResponse)
+        structured_llm = get_analyst_llm().with_structured_output(AnalysisResponse)
         
         analysis_messages = [
             SystemMessage(content=system_prompt),
             HumanMessage(content="Analyze the visualization results and provide insights.")
         ]
         
-        final_output = structured_llm.invoke(analysis_messages)
-        
-        # Format the response nicely
-        formatted_response = f"""
-**EXECUTIVE SUMMARY**
-{final_output.executive_summary}
-
-**DETAILED ANALYSIS**
-{final_output.detailed_analysis}
-
-**KEY TRENDS**
-{chr(10).join(f'• {trend}' for trend in final_output.key_trends)}
-"""
+        final_output = await structured_llm.ainvoke(analysis_messages)
         
-        return {"messages": [AIMessage(content=formatted_response)]}
+        # Emit JSON flagged as structured so the app can format it directly
+        return {"messages": [AIMessage(
+            content=final_output.model_dump_json(),
+            additional_kwargs={"structured": True}
+        )]}
     
     except Exception as e:
         print(f"❌ Analysis Error: {e}")
@@ -221,14 +234,18 @@ Provide your analysis in the structured format requested."""
 
 
 
-workflow = StateGraph(MessagesState)
-workflow.add_node("agent", agent_node)
-workflow.add_node("tool_node", tool_node)
-workflow.add_node("analysis_node", analysis_node)
-workflow.add_edge(START, "agent")
-workflow.add_edge("agent", "tool_node")
-workflow.add_edge("tool_node", "analysis_node")
-workflow.add_edge("analysis_node", END)
-app = workflow.compile()
+@st.cache_resource
+def get_graph_app():
+    """Builds and compiles the LangGraph workflow once per process."""
+    workflow = StateGraph(MessagesState)
+    workflow.add_node("agent", agent_node)
+    workflow.add_node("tool_node", tool_node)
+    workflow.add_node("analysis_node", analysis_node)
+    workflow.add_edge(START, "agent")
+    workflow.add_edge("agent", "tool_node")
+    workflow.add_edge("tool_node", "analysis_node")
+    workflow.add_edge("analysis_node", END)
+    return workflow.compile()
+
 
 
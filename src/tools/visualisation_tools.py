@@ -1,50 +1,175 @@
+import io
+import os
+import re
+import difflib
+import hashlib
+import sqlite3
+import tempfile
+import threading
+from collections import OrderedDict
+from contextlib import closing, contextmanager
 from typing import List, Optional, Tuple, Any
 import numpy as np
 import pandas as pd
 import duckdb
+import matplotlib
+matplotlib.use('Agg')  # Headless backend; must be set before pyplot is imported
 import matplotlib.pyplot as plt
-from mplsoccer import Radar
+from matplotlib.colors import to_rgba
+from matplotlib.figure import Figure
+from matplotlib.lines import Line2D
+from functools import lru_cache
 from langchain_ollama import ChatOllama
 from langchain_core.tools import tool
 from pydantic import BaseModel, Field
 
 
-try:
-    from skillcornerviz.standard_plots import scatter_plot as scpl
-    from skillcornerviz.standard_plots import bar_plot as bar
-    import skillcornerviz.utils as put
-    SKILLCORNER_AVAILABLE = True
-except ImportError:
-    print("⚠️ Warning: SkillCornerViz libraries not found. Using fallback matplotlib.")
-    SKILLCORNER_AVAILABLE = False
+# Plotting libraries only needed by one chart type are imported on first use
+@lru_cache(maxsize=None)
+def _get_skillcorner_bar() -> Any:
+    """Returns SkillCornerViz's bar_plot module, or None if it is not installed."""
+    try:
+        from skillcornerviz.standard_plots import bar_plot
+        return bar_plot
+    except ImportError:
+        print("⚠️ Warning: SkillCornerViz libraries not found. Using fallback matplotlib.")
+        return None
 
 
 DATA_URL = "https://raw.githubusercontent.com/SkillCorner/opendata/master/data/aggregates/aus1league_physicalaggregates_20242025_midfielders.csv"
 
 
-llm_reasoner = ChatOllama(model="llama3.1:latest", temperature=0)
+@lru_cache(maxsize=None)
+def _get_llm() -> ChatOllama:
+    """Column-selection LLM, constructed on first tool call."""
+    return ChatOllama(model="llama3.1:latest", temperature=0)
+
+
+DATA_CACHE_PATH = "aus1league_midfielders.parquet"
+PLAYER_NAME_COLUMN = "player_short_name"
+PLAYER_NAME_LC_COLUMN = "_player_name_lc"
+CATEGORICAL_COLUMNS = (PLAYER_NAME_COLUMN, "team_name")
 
 
 _cached_df = None
+_load_lock = threading.Lock()
+_cached_columns_string = None
+_cached_numeric_columns = None
 
 def load_data() -> pd.DataFrame:
-    """Load data with caching to avoid repeated downloads."""
+    """
+    Load data with caching to avoid repeated downloads.
+    The CSV is fetched once and kept on disk as Parquet for later processes.
+    The returned DataFrame is shared; callers must treat it as read-only.
+    """
     global _cached_df
     if _cached_df is None:
-        _cached_df = pd.read_csv(DATA_URL)
-    return _cached_df.copy()
+        # Sessions are threads in one process; only one of them loads
+        with _load_lock:
+            if _cached_df is None:
+                if not os.path.exists(DATA_CACHE_PATH):
+                    # Unique temp file plus rename, so other processes never
+                    # see a partial file
+                    fd, tmp_path = tempfile.mkstemp(
+                        dir=os.path.dirname(os.path.abspath(DATA_CACHE_PATH)), suffix=".tmp"
+                    )
+                    os.close(fd)
+                    try:
+                        pd.read_csv(DATA_URL).to_parquet(tmp_path, index=False)
+                        os.replace(tmp_path, DATA_CACHE_PATH)
+                    except BaseException:
+                        os.remove(tmp_path)
+                        raise
+                df = pd.read_parquet(DATA_CACHE_PATH)
+                # Low-cardinality labels as categoricals: integer codes instead
+                # of one Python string object per row
+                for col in CATEGORICAL_COLUMNS:
+                    if col in df.columns:
+                        df[col] = df[col].astype('category')
+                _cached_df = df
+    return _cached_df
+
+_duckdb_con = None
+_duckdb_lock = threading.Lock()
+
+def get_duckdb_cursor() -> duckdb.DuckDBPyConnection:
+    """
+    Returns a cursor on the shared in-memory database holding `my_df`.
+    The table is materialized once per process; each caller gets its own
+    cursor so concurrent sessions never share a connection.
+    """
+    global _duckdb_con
+    with _duckdb_lock:
+        if _duckdb_con is None:
+            con = duckdb.connect(database=':memory:')
+            con.register('source_df', load_data())
+            # Lowercased shadow of the player name, so radar lookups do not
+            # fold case on every row per query
+            con.execute(f"""
+                CREATE TABLE my_df AS
+                SELECT *, LOWER("{PLAYER_NAME_COLUMN}") AS {PLAYER_NAME_LC_COLUMN}
+                FROM source_df
+            """)
+            con.unregister('source_df')
+            _duckdb_con = con
+    return _duckdb_con.cursor()
 
 def get_columns_string(df: pd.DataFrame) -> str:
-    """Returns column names as comma-separated string."""
-    return ", ".join(df.columns.tolist())
+    """
+    Returns column names as comma-separated string.
+    The schema is static, so the string is built once.
+    """
+    global _cached_columns_string
+    if _cached_columns_string is None:
+        _cached_columns_string = ", ".join(df.columns.tolist())
+    return _cached_columns_string
 
-def get_columns_with_types(df: pd.DataFrame) -> str:
+def get_numeric_columns(df: pd.DataFrame) -> frozenset:
     """
-    Returns columns WITH their data types.
-    Essential for distinguishing numeric vs text columns.
+    Returns the set of int64/float64 columns, the only valid radar metrics.
+    The schema is static, so the set is built once.
     """
-    return ", ".join([f"{col} ({str(dtype)})" for col, dtype in df.dtypes.items()])
+    global _cached_numeric_columns
+    if _cached_numeric_columns is None:
+        _cached_numeric_columns = frozenset(df.select_dtypes(include=['int64', 'float64']).columns)
+    return _cached_numeric_columns
+
+
 
+# --- LLM CONFIG CACHE ---
+CONFIG_CACHE_PATH = "llm_config_cache.sqlite"
+
+def _config_cache_key(chart_type: str, user_query: str, cols_context: str) -> str:
+    """Key on chart type, whitespace/case-normalized query and schema."""
+    normalized = " ".join(user_query.lower().split())
+    raw = "\0".join([chart_type, normalized, cols_context])
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+def _connect_config_cache() -> sqlite3.Connection:
+    con = sqlite3.connect(CONFIG_CACHE_PATH)
+    con.execute("CREATE TABLE IF NOT EXISTS configs (key TEXT PRIMARY KEY, config TEXT NOT NULL)")
+    return con
+
+def _load_cached_config(key: str, config_model: Any) -> Optional[Any]:
+    """Return a previously successful config for this key, or None."""
+    try:
+        with closing(_connect_config_cache()) as con:
+            row = con.execute("SELECT config FROM configs WHERE key = ?", (key,)).fetchone()
+        return config_model.model_validate_json(row[0]) if row else None
+    except Exception as e:
+        print(f"Config cache read failed: {e}")
+        return None
+
+def _store_cached_config(key: str, config: Any) -> None:
+    """Persist a config whose SQL returned data."""
+    try:
+        with closing(_connect_config_cache()) as con, con:
+            con.execute(
+                "INSERT OR REPLACE INTO configs (key, config) VALUES (?, ?)",
+                (key, config.model_dump_json())
+            )
+    except Exception as e:
+        print(f"Config cache write failed: {e}")
 
 
 class BarChartConfig(BaseModel):
@@ -73,33 +198,181 @@ class RadarChartConfig(BaseModel):
     target_player: str = Field(..., description="Name or partial name of the player to profile.")
 
 
-def _generate_sql_from_config(config: Any, chart_type: str) -> str:
-    """Build SQL query from Pydantic config."""
+def _quote_column(column: str) -> str:
+    """
+    Validate a column name against the dataset schema and quote it.
+    Identifiers cannot be bound as parameters, so this whitelist is what
+    keeps LLM-chosen names from injecting SQL.
+    """
+    columns = load_data().columns
+    if column not in columns:
+        # Same hint format as DuckDB binder errors
+        candidates = difflib.get_close_matches(column, columns, n=3, cutoff=0.6)
+        quoted = ", ".join(f'"{c}"' for c in candidates)
+        hint = f"\nCandidate bindings: {quoted}" if candidates else ""
+        raise ValueError(f'Referenced column "{column}" not found in my_df{hint}')
+    return f'"{column}"'
+
+def _scatter_label_metric(config: Any) -> str:
+    """Metric used to pick the Top 5 / Bottom 5 labels on a scatter plot."""
+    if config.top_n_metric in (config.x_metric_column, config.y_metric_column):
+        return config.top_n_metric
+    return config.y_metric_column
+
+def _generate_sql_from_config(config: Any, chart_type: str) -> Tuple[str, list]:
+    """
+    Build SQL query and bound parameters from Pydantic config.
+    Scalar values are passed as parameters so the statement text only
+    varies with the chosen columns.
+    """
     if chart_type == "bar":
+        name_col = _quote_column(config.name_column)
+        metric_col = _quote_column(config.metric_column)
+        sort_order = "ASC" if str(config.sort_order).upper() == "ASC" else "DESC"
         return f"""
-            SELECT {config.name_column}, {config.metric_column} 
+            SELECT {name_col}, {metric_col} 
             FROM my_df 
-            WHERE {config.metric_column} IS NOT NULL
-            ORDER BY {config.metric_column} {config.sort_order} 
-            LIMIT {config.limit}
-        """
+            WHERE {metric_col} IS NOT NULL
+            ORDER BY {metric_col} {sort_order} 
+            LIMIT ?
+        """, [int(config.limit)]
     elif chart_type == "scatter":
+        x_col = _quote_column(config.x_metric_column)
+        y_col = _quote_column(config.y_metric_column)
         return f"""
-            SELECT {config.name_column}, {config.group_column}, 
-                   {config.x_metric_column}, {config.y_metric_column} 
+            SELECT {_quote_column(config.name_column)}, {_quote_column(config.group_column)}, 
+                   {x_col}, {y_col} 
             FROM my_df
-            WHERE {config.x_metric_column} IS NOT NULL 
-              AND {config.y_metric_column} IS NOT NULL
-        """
+            WHERE {x_col} IS NOT NULL 
+              AND {y_col} IS NOT NULL
+        """, []
     elif chart_type == "radar":
-        metrics_sql = ", ".join(config.metric_columns)
+        name_col = _quote_column(config.name_column)
+        metrics_sql = ", ".join(_quote_column(col) for col in config.metric_columns)
+        if config.name_column == PLAYER_NAME_COLUMN:
+            search_col = PLAYER_NAME_LC_COLUMN
+        else:
+            search_col = f"LOWER({name_col})"
         return f"""
-            SELECT {config.name_column}, {metrics_sql} 
+            SELECT {name_col}, {metrics_sql} 
             FROM my_df 
-            WHERE LOWER({config.name_column}) LIKE LOWER('%{config.target_player}%')
+            WHERE CONTAINS({search_col}, ?)
             LIMIT 1
-        """
-    return ""
+        """, [config.target_player.lower()]
+    return "", []
+
+CANDIDATE_RE = re.compile(r'Candidate bindings?:\s*(.+)')
+QUOTED_NAME_RE = re.compile(r'"([^"]+)"')
+
+def _closest_column(name: str, candidates: List[str], columns: List[str],
+                    cutoff: float = 0.6) -> Optional[str]:
+    """Best replacement for an unknown column: error candidates first, then fuzzy match."""
+    valid_candidates = [c for c in candidates if c in columns]
+    pool = valid_candidates or columns
+    matches = difflib.get_close_matches(name, pool, n=1, cutoff=cutoff)
+    return matches[0] if matches else None
+
+def _repair_config_locally(config: Any, error_msg: str) -> Optional[Any]:
+    """
+    Fix unknown column names in a config without another LLM call.
+    Uses the "Candidate bindings" hint in the error when present and
+    difflib against the schema otherwise. Returns None if nothing could be
+    changed or any bad column has no close match.
+    """
+    if config is None:
+        return None
+    columns = load_data().columns.tolist()
+    match = CANDIDATE_RE.search(error_msg)
+    candidates = QUOTED_NAME_RE.findall(match.group(1)) if match else []
+    
+    update = {}
+    for field in ("name_column", "group_column", "metric_column", "x_metric_column", "y_metric_column"):
+        value = getattr(config, field, None)
+        if value is None or value in columns:
+            continue
+        fixed = _closest_column(value, candidates, columns)
+        if fixed is None:
+            return None
+        update[field] = fixed
+    
+    metric_columns = getattr(config, "metric_columns", None)
+    if metric_columns is not None:
+        fixed_metrics, notes = _fix_radar_metrics(metric_columns, candidates)
+        if notes:
+            update["metric_columns"] = fixed_metrics
+            update["reasoning"] = _note_metric_changes(config.reasoning, notes)
+    
+    if not update:
+        return None
+    print(f"Repaired columns locally: {update}")
+    return config.model_copy(update=update)
+
+RADAR_MIN_METRICS = 3  # mplsoccer's Radar needs at least three params
+METRIC_TYPO_CUTOFF = 0.85  # Only near-identical spellings count as typos
+
+def _fix_radar_metrics(metric_columns: List[str], candidates: List[str]) -> Tuple[List[str], List[str]]:
+    """
+    Returns the usable radar metrics and a note for every change made.
+    Existing text columns are dropped rather than swapped for a numeric
+    one; names not in the schema are only repaired when they are a typo of
+    a numeric column, and dropped otherwise.
+    """
+    df = load_data()
+    numeric = get_numeric_columns(df)
+    if numeric.issuperset(metric_columns):
+        return metric_columns, []
+    metric_pool = [c for c in df.columns if c in numeric]
+    fixed_metrics = []
+    notes = []
+    for value in metric_columns:
+        if value in numeric:
+            fixed_metrics.append(value)
+        elif value in df.columns:
+            notes.append(f"dropped non-numeric '{value}'")
+        else:
+            fixed = _closest_column(value, candidates, metric_pool, cutoff=METRIC_TYPO_CUTOFF)
+            if fixed is None:
+                notes.append(f"dropped unknown '{value}'")
+            else:
+                fixed_metrics.append(fixed)
+                notes.append(f"read '{value}' as '{fixed}'")
+    # A repaired name may collide with one already selected
+    return list(dict.fromkeys(fixed_metrics)), notes
+
+def _note_metric_changes(reasoning: str, notes: List[str]) -> str:
+    """Records metric changes in the config's reasoning, which the analyst reads."""
+    summary = "; ".join(notes)
+    print(f"Adjusted radar metrics: {summary}")
+    return f"{reasoning} (Metric adjustments: {summary})"
+
+def _check_radar_metrics(config: Any) -> Any:
+    """
+    Ensure the radar metrics are at least three numeric columns before any
+    SQL runs. Raises ValueError if too few remain, so the caller's repair
+    and LLM correction take over.
+    """
+    fixed_metrics, notes = _fix_radar_metrics(config.metric_columns, [])
+    if len(fixed_metrics) < RADAR_MIN_METRICS:
+        raise ValueError(
+            f"Radar charts need at least {RADAR_MIN_METRICS} numeric metric_columns; "
+            f"usable columns from {config.metric_columns}: {fixed_metrics}"
+        )
+    if not notes:
+        return config
+    return config.model_copy(update={
+        "metric_columns": fixed_metrics,
+        "reasoning": _note_metric_changes(config.reasoning, notes),
+    })
+
+def _query_df(sql: str, params: list) -> pd.DataFrame:
+    """
+    Run a query on its own cursor and hand the Arrow result to pandas,
+    letting Arrow release each column as it is converted instead of
+    holding both copies. The cursor is closed once the result is fetched.
+    """
+    with get_duckdb_cursor() as con:
+        table = con.execute(sql, params).fetch_arrow_table()
+    return table.to_pandas(split_blocks=True, self_destruct=True)
 
 def _generate_data_with_llama(user_query: str, chart_type: str) -> Tuple[pd.DataFrame, Any]:
     """
@@ -108,19 +381,17 @@ def _generate_data_with_llama(user_query: str, chart_type: str) -> Tuple[pd.Data
     """
     df_source = load_data()
     if chart_type == "radar":
-        cols_context = get_columns_with_types(df_source)
+        # Only numeric columns can be radar metrics, so only those are sent
+        numeric = get_numeric_columns(df_source)
+        cols_context = ", ".join(c for c in df_source.columns if c in numeric)
         extra_instructions = """
-CRITICAL: For 'metric_columns', select ONLY columns with types 'int64' or 'float64'.
-DO NOT select 'object' type columns (these are text/strings, not numbers).
+All columns listed are numeric; pick 'metric_columns' from them.
+Player names are in 'player_short_name'.
 Look for metrics like distance, speed, acceleration, etc."""
     else:
         cols_context = get_columns_string(df_source)
         extra_instructions = ""
     
-    # Setup DuckDB connection
-    con = duckdb.connect(database=':memory:')
-    con.register('my_df', df_source)
-    
     print(f"\n--- LLM Reasoning for {chart_type.upper()} Chart ---")
     
     # Select config model
@@ -130,7 +401,22 @@ Look for metrics like distance, speed, acceleration, etc."""
         "radar": RadarChartConfig
     }[chart_type]
     
-    structured_llm = llm_reasoner.with_structured_output(config_model)
+    # Reuse the column selection from an identical earlier query if it still works
+    cache_key = _config_cache_key(chart_type, user_query, cols_context)
+    config = _load_cached_config(cache_key, config_model)
+    if config is not None:
+        try:
+            if chart_type == "radar":
+                config = _check_radar_metrics(config)
+            sql, params = _generate_sql_from_config(config, chart_type)
+            result_df = _query_df(sql, params)
+            if not result_df.empty:
+                print(f"Using cached column selection. Retrieved {len(result_df)} rows")
+                return result_df, config
+        except Exception as cached_error:
+            print(f"Cached config failed, asking the LLM: {cached_error}")
+    
+    structured_llm = _get_llm().with_structured_output(config_model)
     
     # ATTEMPT 1: Initial query
     base_prompt = f"""You are analyzing Australian A-League midfielder data.
@@ -144,18 +430,22 @@ YOUR TASK: Select the exact column names (case-sensitive) that best answer the q
 
 Provide reasoning for your choices."""
 
+    config = None
     try:
         config = structured_llm.invoke(base_prompt)
-        sql = _generate_sql_from_config(config, chart_type)
+        if chart_type == "radar":
+            config = _check_radar_metrics(config)
+        sql, params = _generate_sql_from_config(config, chart_type)
         
         print(f"Generated SQL:\n{sql}")
-        result_df = con.execute(sql).df()
+        result_df = _query_df(sql, params)
         
         if result_df.empty:
             print("Query returned no results")
             return pd.DataFrame(), None
         
         print(f"Retrieved {len(result_df)} rows")
+        _store_cached_config(cache_key, config)
         return result_df, config
     
     except Exception as initial_error:
@@ -163,6 +453,22 @@ Provide reasoning for your choices."""
         print(f"Initial attempt failed: {error_msg}")
         print("--- Attempting self-correction ---")
         
+        # Cheap path first: fix misspelt columns from the error / schema
+        repaired = _repair_config_locally(config, error_msg)
+        if repaired is not None:
+            try:
+                if chart_type == "radar":
+                    repaired = _check_radar_metrics(repaired)
+                sql, params = _generate_sql_from_config(repaired, chart_type)
+                print(f"Locally corrected SQL:\n{sql}")
+                result_df = _query_df(sql, params)
+                if not result_df.empty:
+                    print(f" Retrieved {len(result_df)} rows after local correction")
+                    _store_cached_config(cache_key, repaired)
+                    return result_df, repaired
+            except Exception as repair_error:
+                print(f"Local correction failed: {repair_error}")
+        
         correction_prompt = f"""PREVIOUS ATTEMPT FAILED with error:
 {error_msg}
 
@@ -176,16 +482,19 @@ YOUR TASK: Fix the column names based on the error message. Look for exact match
 
         try:
             config = structured_llm.invoke(correction_prompt)
-            sql = _generate_sql_from_config(config, chart_type)
+            if chart_type == "radar":
+                config = _check_radar_metrics(config)
+            sql, params = _generate_sql_from_config(config, chart_type)
             
             print(f"Corrected SQL:\n{sql}")
-            result_df = con.execute(sql).df()
+            result_df = _query_df(sql, params)
             
             if result_df.empty:
                 print("Corrected query returned no results")
                 return pd.DataFrame(), None
             
             print(f" Retrieved {len(result_df)} rows after correction")
+            _store_cached_config(cache_key, config)
             return result_df, config
         
         except Exception as final_error:
@@ -194,6 +503,127 @@ YOUR TASK: Fix the column names based on the error message. Look for exact match
 
 
 
+def _format_cell(value: Any) -> str:
+    if isinstance(value, (float, np.floating)):
+        return "" if np.isnan(value) else f"{value:.2f}"
+    return str(value).replace("|", "\\|")
+
+def _to_markdown(df: pd.DataFrame) -> str:
+    """
+    Markdown table for the small result tables in tool output.
+    Builds rows straight from column arrays instead of going through tabulate.
+    """
+    columns = [str(col) for col in df.columns]
+    arrays = [df.iloc[:, j].to_numpy() for j in range(len(columns))]
+    lines = [
+        "| " + " | ".join(columns) + " |",
+        "|" + "|".join(["---"] * len(columns)) + "|",
+    ]
+    for i in range(len(df)):
+        lines.append("| " + " | ".join(_format_cell(arr[i]) for arr in arrays) + " |")
+    return "\n".join(lines)
+
+def _top_bottom_positions(values: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Positions of the k largest and k smallest values, each sorted from the
+    extreme inwards. Uses a linear-time partition instead of full sorts.
+    """
+    k = min(k, len(values))
+    if k == len(values):
+        order = np.argsort(values)
+        return order[::-1], order
+    idx_high = np.argpartition(values, -k)[-k:]
+    idx_low = np.argpartition(values, k - 1)[:k]
+    idx_high = idx_high[np.argsort(values[idx_high])[::-1]]
+    idx_low = idx_low[np.argsort(values[idx_low])]
+    return idx_high, idx_low
+
+
+def _min_max_kernel(values):
+    """Per-column NaN-skipping (min, max) in one pass over the rows."""
+    n_rows, n_cols = values.shape
+    out = np.full((2, n_cols), np.nan)
+    for j in range(n_cols):
+        lo = np.inf
+        hi = -np.inf
+        for i in range(n_rows):
+            v = values[i, j]
+            if v < lo:
+                lo = v
+            if v > hi:
+                hi = v
+        if lo <= hi:
+            out[0, j] = lo
+            out[1, j] = hi
+    return out
+
+# Numba is optional and only imported on the first radar chart
+@lru_cache(maxsize=None)
+def _get_min_max_kernel() -> Any:
+    """Returns the Numba-compiled min/max kernel, or None if Numba is not installed."""
+    try:
+        from numba import njit
+    except ImportError:
+        return None
+    return njit(cache=True)(_min_max_kernel)
+
+def _column_min_max(values: np.ndarray) -> np.ndarray:
+    """
+    Returns a (2, n_cols) array of column minima and maxima, ignoring NaN.
+    Uses a compiled Numba kernel when available, NumPy otherwise.
+    """
+    kernel = _get_min_max_kernel()
+    if kernel is not None:
+        return kernel(np.ascontiguousarray(values, dtype=np.float64))
+    return np.vstack([np.nanmin(values, axis=0), np.nanmax(values, axis=0)])
+
+_figure_pool = threading.local()
+
+@contextmanager
+def _pooled_figure(figsize: Tuple[float, float]):
+    """
+    Yields a reusable (fig, ax) pair for the given size with the axes cleared.
+    Each thread (Streamlit session) has its own pool, so concurrent renders
+    never share a figure and never wait on each other.
+    """
+    pool = getattr(_figure_pool, "figures", None)
+    if pool is None:
+        pool = _figure_pool.figures = {}
+    if figsize not in pool:
+        fig = Figure(figsize=figsize, constrained_layout=True)
+        pool[figsize] = (fig, fig.subplots())
+    fig, ax = pool[figsize]
+    ax.cla()
+    yield fig, ax
+
+RENDERED_PNG_LIMIT = 16
+_rendered_pngs = OrderedDict()
+_rendered_pngs_lock = threading.Lock()
+
+def _save_png(fig: Any, filename: str, **savefig_kwargs) -> bytes:
+    """
+    Renders the figure to PNG bytes in memory, then persists them with one
+    large buffered write. The bytes are kept so the app can display the
+    chart without reading the file back.
+    """
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", **savefig_kwargs)
+    png_bytes = buf.getvalue()
+    with open(filename, "wb", buffering=1 << 20) as file:
+        file.write(png_bytes)
+    with _rendered_pngs_lock:
+        _rendered_pngs[filename] = png_bytes
+        _rendered_pngs.move_to_end(filename)
+        while len(_rendered_pngs) > RENDERED_PNG_LIMIT:
+            _rendered_pngs.popitem(last=False)
+    return png_bytes
+
+def get_rendered_png(filename: str) -> Optional[bytes]:
+    """Bytes of the most recent render of a chart file, if still held in memory."""
+    with _rendered_pngs_lock:
+        return _rendered_pngs.get(filename)
+
+
 class ChartInput(BaseModel):
     """Input schema for all chart tools."""
     query: str = Field(..., description="User's question or request for visualization.")
@@ -217,8 +647,11 @@ def create_dynamic_bar_chart(query: str, title: str) -> str:
         if df_plot.empty or config is None:
             return "Error: Could not generate bar chart. No data returned from query."
         
+        filename = f"bar_{config.metric_column}.png"
+        
         # Create visualization
-        if SKILLCORNER_AVAILABLE:
+        bar = _get_skillcorner_bar()
+        if bar is not None:
             fig, ax = bar.plot_bar_chart(
                 df_plot,
                 metric=config.metric_column,
@@ -230,18 +663,17 @@ def create_dynamic_bar_chart(query: str, title: str) -> str:
                 primary_highlight_color='#006D00',
                 add_bar_values=True
             )
+            # SkillCornerViz sizes its own figure, so keep the tight bbox here
+            _save_png(fig, filename, bbox_inches="tight", dpi=150)
+            plt.close(fig)
         else:
             # Fallback matplotlib implementation
-            fig, ax = plt.subplots(figsize=(10, 8))
-            ax.barh(df_plot[config.name_column], df_plot[config.metric_column], color='#006D00')
-            ax.set_xlabel(config.metric_column.replace('_', ' ').title())
-            ax.set_ylabel('Player')
-            ax.set_title(title)
-            plt.tight_layout()
-        
-        filename = f"bar_{config.metric_column}.png"
-        fig.savefig(filename, bbox_inches="tight", dpi=300)
-        plt.close(fig)
+            with _pooled_figure((10, 8)) as (fig, ax):
+                ax.barh(df_plot[config.name_column], df_plot[config.metric_column], color='#006D00')
+                ax.set_xlabel(config.metric_column.replace('_', ' ').title())
+                ax.set_ylabel('Player')
+                ax.set_title(title)
+                _save_png(fig, filename, dpi=150)
         
         print(f"Saved: {filename}")
         
@@ -254,7 +686,7 @@ def create_dynamic_bar_chart(query: str, title: str) -> str:
 - Sort order: {config.sort_order}
 
 **Data Table:**
-{df_plot.to_markdown(index=False)}
+{_to_markdown(df_plot)}
 
 **Reasoning:** {config.reasoning}
 """
@@ -283,113 +715,112 @@ def create_dynamic_scatter_plot(query: str, title: str) -> str:
             return "❌ Error: Could not generate scatter plot. No data returned from query."
         
         # Determine primary metric for labeling
-        label_metric = config.top_n_metric if config.top_n_metric in df_plot.columns else config.y_metric_column
+        label_metric = _scatter_label_metric(config)
         
         # Get top 5 and bottom 5 players
-        top_5_df = df_plot.nlargest(5, label_metric)
-        bottom_5_df = df_plot.nsmallest(5, label_metric)
-        
-        top_5_names = set(top_5_df[config.name_column].tolist())
-        bottom_5_names = set(bottom_5_df[config.name_column].tolist())
-        
-        print(f"📊 Top 5 by {label_metric}: {list(top_5_names)}")
-        print(f"📊 Bottom 5 by {label_metric}: {list(bottom_5_names)}")
-        
-        # Create matplotlib scatter plot
-        fig, ax = plt.subplots(figsize=(14, 10))
-        
-        # Plot all points
-        ax.scatter(
-            df_plot[config.x_metric_column], 
-            df_plot[config.y_metric_column],
-            alpha=0.5,
-            s=100,
-            c='#cccccc',
-            edgecolors='black',
-            linewidth=0.5,
-            label='All Players'
-        )
-        
-        # Highlight top 5 (green)
-        top_5_data = df_plot[df_plot[config.name_column].isin(top_5_names)]
-        ax.scatter(
-            top_5_data[config.x_metric_column],
-            top_5_data[config.y_metric_column],
-            alpha=0.8,
-            s=150,
-            c='#006D00',
-            edgecolors='black',
-            linewidth=1.5,
-            label='Top 5',
-            zorder=5
-        )
-        
-        # Highlight bottom 5 (red)
-        bottom_5_data = df_plot[df_plot[config.name_column].isin(bottom_5_names)]
-        ax.scatter(
-            bottom_5_data[config.x_metric_column],
-            bottom_5_data[config.y_metric_column],
-            alpha=0.8,
-            s=150,
-            c='#d62728',
-            edgecolors='black',
-            linewidth=1.5,
-            label='Bottom 5',
-            zorder=5
-        )
-        
-        # Add labels for top 5 (above points)
-        for _, row in top_5_data.iterrows():
-            ax.annotate(
-                row[config.name_column],
-                xy=(row[config.x_metric_column], row[config.y_metric_column]),
-                xytext=(0, 10),
-                textcoords='offset points',
-                ha='center',
-                fontsize=9,
-                fontweight='bold',
-                color='#006D00',
-                bbox=dict(boxstyle='round,pad=0.3', facecolor='white', edgecolor='#006D00', alpha=0.8)
+        idx_high, idx_low = _top_bottom_positions(df_plot[label_metric].to_numpy(), 5)
+        top_5_df = df_plot.iloc[idx_high]
+        bottom_5_df = df_plot.iloc[idx_low]
+        
+        print(f"📊 Top 5 by {label_metric}: {top_5_df[config.name_column].tolist()}")
+        print(f"📊 Bottom 5 by {label_metric}: {bottom_5_df[config.name_column].tolist()}")
+        
+        # Create matplotlib scatter plot on a pooled figure
+        with _pooled_figure((14, 10)) as (fig, ax):
+            # All points in one collection; highlights are styled per point
+            # and drawn last so they sit on top of the background cloud
+            n_points = len(df_plot)
+            face_colors = np.tile(to_rgba('#cccccc', 0.5), (n_points, 1))
+            sizes = np.full(n_points, 100.0)
+            line_widths = np.full(n_points, 0.5)
+            face_colors[idx_high] = to_rgba('#006D00', 0.8)
+            face_colors[idx_low] = to_rgba('#d62728', 0.8)
+            highlighted = np.zeros(n_points, dtype=bool)
+            highlighted[idx_high] = True
+            highlighted[idx_low] = True
+            sizes[highlighted] = 150.0
+            line_widths[highlighted] = 1.5
+            order = np.argsort(highlighted, kind='stable')
+            ax.scatter(
+                df_plot[config.x_metric_column].to_numpy()[order],
+                df_plot[config.y_metric_column].to_numpy()[order],
+                s=sizes[order],
+                c=face_colors[order],
+                edgecolors='black',
+                linewidths=line_widths[order],
+                rasterized=True
             )
         
-        # Add labels for bottom 5 (below points)
-        for _, row in bottom_5_data.iterrows():
-            ax.annotate(
-                row[config.name_column],
-                xy=(row[config.x_metric_column], row[config.y_metric_column]),
-                xytext=(0, -10),
-                textcoords='offset points',
-                ha='center',
-                fontsize=9,
-                fontweight='bold',
-                color='#d62728',
-                bbox=dict(boxstyle='round,pad=0.3', facecolor='white', edgecolor='#d62728', alpha=0.8)
+            # Add labels for top 5 (above points)
+            for name, x, y in zip(
+                top_5_df[config.name_column].to_numpy(),
+                top_5_df[config.x_metric_column].to_numpy(),
+                top_5_df[config.y_metric_column].to_numpy()
+            ):
+                ax.annotate(
+                    name,
+                    xy=(x, y),
+                    xytext=(0, 10),
+                    textcoords='offset points',
+                    ha='center',
+                    fontsize=9,
+                    fontweight='bold',
+                    color='#006D00',
+                    bbox=dict(boxstyle='round,pad=0.3', facecolor='white', edgecolor='#006D00', alpha=0.8)
+                )
+        
+            # Add labels for bottom 5 (below points)
+            for name, x, y in zip(
+                bottom_5_df[config.name_column].to_numpy(),
+                bottom_5_df[config.x_metric_column].to_numpy(),
+                bottom_5_df[config.y_metric_column].to_numpy()
+            ):
+                ax.annotate(
+                    name,
+                    xy=(x, y),
+                    xytext=(0, -10),
+                    textcoords='offset points',
+                    ha='center',
+                    fontsize=9,
+                    fontweight='bold',
+                    color='#d62728',
+                    bbox=dict(boxstyle='round,pad=0.3', facecolor='white', edgecolor='#d62728', alpha=0.8)
+                )
+        
+            # Add trend line (closed-form least squares, drawn between the x extremes)
+            x = df_plot[config.x_metric_column].to_numpy(dtype=np.float64)
+            y = df_plot[config.y_metric_column].to_numpy(dtype=np.float64)
+            x_mean, y_mean = x.mean(), y.mean()
+            x_var = ((x - x_mean) ** 2).sum()
+            slope = ((x - x_mean) * (y - y_mean)).sum() / x_var if x_var else 0.0
+            intercept = y_mean - slope * x_mean
+            x0, x1 = x.min(), x.max()
+            trend_line, = ax.plot(
+                [x0, x1],
+                [intercept + slope * x0, intercept + slope * x1],
+                "k--",
+                alpha=0.3,
+                linewidth=1,
+                label='Trend Line',
+                rasterized=True
             )
         
-        # Add trend line
-        z = np.polyfit(df_plot[config.x_metric_column], df_plot[config.y_metric_column], 1)
-        p = np.poly1d(z)
-        ax.plot(
-            df_plot[config.x_metric_column],
-            p(df_plot[config.x_metric_column]),
-            "k--",
-            alpha=0.3,
-            linewidth=1,
-            label='Trend Line'
-        )
-        
-        # Formatting
-        ax.set_xlabel(config.x_metric_column.replace('_', ' ').title(), fontsize=12, fontweight='bold')
-        ax.set_ylabel(config.y_metric_column.replace('_', ' ').title(), fontsize=12, fontweight='bold')
-        ax.set_title(title, fontsize=14, fontweight='bold', pad=20)
-        ax.legend(loc='best', framealpha=0.9)
-        ax.grid(True, alpha=0.3, linestyle='--')
-        
-        plt.tight_layout()
-        
-        filename = "scatter_plot_generated.png"
-        fig.savefig(filename, bbox_inches="tight", dpi=300, facecolor='white')
-        plt.close(fig)
+            # Formatting
+            ax.set_xlabel(config.x_metric_column.replace('_', ' ').title(), fontsize=12, fontweight='bold')
+            ax.set_ylabel(config.y_metric_column.replace('_', ' ').title(), fontsize=12, fontweight='bold')
+            ax.set_title(title, fontsize=14, fontweight='bold', pad=20)
+            # Proxy artists stand in for the single scatter collection
+            legend_handles = [
+                Line2D([], [], linestyle='none', marker='o', markersize=10, markerfacecolor=to_rgba(color, alpha),
+                       markeredgecolor='black', label=label)
+                for color, alpha, label in (('#cccccc', 0.5, 'All Players'), ('#006D00', 0.8, 'Top 5'), ('#d62728', 0.8, 'Bottom 5'))
+            ]
+            legend_handles.append(trend_line)
+            ax.legend(handles=legend_handles, loc='best', framealpha=0.9)
+            ax.grid(True, alpha=0.3, linestyle='--')
+        
+            filename = "scatter_plot_generated.png"
+            _save_png(fig, filename, dpi=150, facecolor='white')
         
         print(f"✅ Saved: {filename}")
         
@@ -405,10 +836,10 @@ def create_dynamic_scatter_plot(query: str, title: str) -> str:
 - Highlighted: Top 5 (🟢 green) and Bottom 5 (🔴 red) by {label_metric}
 
 **Top 5 Players:**
-{top_5_df[[config.name_column, config.x_metric_column, config.y_metric_column]].to_markdown(index=False)}
+{_to_markdown(top_5_df[[config.name_column, config.x_metric_column, config.y_metric_column]])}
 
 **Bottom 5 Players:**
-{bottom_5_df[[config.name_column, config.x_metric_column, config.y_metric_column]].to_markdown(index=False)}
+{_to_markdown(bottom_5_df[[config.name_column, config.x_metric_column, config.y_metric_column]])}
 
 **Reasoning:** {config.reasoning}
 """
@@ -437,10 +868,13 @@ def create_dynamic_radar_chart(query: str, title: str) -> str:
         
         df_source = load_data()
         params = config.metric_columns
-        low = [df_source[col].min() for col in params]
-        high = [df_source[col].max() for col in params]
-        player_values = df_plot.iloc[0][params].tolist()
+        # League range for every metric in one pass over the columns
+        league_range = _column_min_max(df_source[params].to_numpy(dtype=np.float64))
+        low, high = league_range
+        player_values = df_plot.iloc[0][params].to_numpy(dtype=np.float64)
         player_name = df_plot.iloc[0][config.name_column]
+        from mplsoccer import Radar
+        
         radar = Radar(params, low, high, num_rings=4, ring_width=1, center_circle_radius=1)
         fig, ax = radar.setup_axis()
         
@@ -452,7 +886,7 @@ def create_dynamic_radar_chart(query: str, title: str) -> str:
         fig.suptitle(f"{title}\n{player_name}", fontsize=14, y=0.98)
         
         filename = f"radar_{player_name.replace(' ', '_')}.png"
-        fig.savefig(filename, bbox_inches="tight", dpi=150)
+        _save_png(fig, filename, bbox_inches="tight", dpi=150)
         plt.close(fig)
         
         print(f"✅ Saved: {filename}")
@@ -468,7 +902,7 @@ def create_dynamic_radar_chart(query: str, title: str) -> str:
 **Player Profile:** {player_name}
 
 **Metrics Analyzed:**
-{metrics_df.to_markdown(index=False)}
+{_to_markdown(metrics_df)}
 
 **Interpretation:**
 - Values closer to the edge indicate performance closer to league maximum